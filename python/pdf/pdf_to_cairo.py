@@ -3,42 +3,127 @@
 Test pdftocairo (Poppler) locally:
 - Verifies pdftocairo is on PATH
 - Optionally prints pdfinfo for the input
-- Converts one/all pages to SVG (one page at a time) into an output folder
+- Converts one/all pages to SVG (one process per page, run in parallel) into an output folder
 - Lists the generated files and exits non-zero on failure
 
 Examples:
   python test_pdftocairo.py -i "C:\\path\\plan.pdf" -o C:\\tmp\\svgs
   python test_pdftocairo.py -i ./plan.pdf -o ./out --first 1 --last 2 --verbose
+  python test_pdftocairo.py -i ./plan.pdf -o ./out --jobs 4
 """
 
 import argparse
 import glob
 import os
+import re
 import shutil
 import subprocess
 import sys
 import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def run_cmd(cmd, **kw):
-    """Run a command; return (rc, stdout, stderr)."""
-    p = subprocess.run(cmd, capture_output=True, text=True, **kw)
+# On POSIX, fds opened by Python are non-inheritable (PEP 446), so the
+# close_fds sweep is redundant; skipping it (with no cwd) lets subprocess use
+# posix_spawn. Callers pass absolute paths instead of a cwd for that reason.
+POPEN_DEFAULTS = {"close_fds": os.name != "posix"}
+
+PAGES_RE = re.compile(rb"^Pages:\s*(\d+)", re.M)
+# pdftocairo's error for a page past the end of the document
+PAST_END_RE = re.compile(rb"Wrong page range given")
+
+def run_cmd(cmd, text=True, **kw):
+    """Run a command; return (rc, stdout, stderr), as raw bytes if text=False."""
+    kw = {**POPEN_DEFAULTS, **kw}
+    p = subprocess.run(cmd, capture_output=True, text=text, **kw)
     return p.returncode, p.stdout, p.stderr
 
+def run_parallel(cmds, jobs, verbose=False, past_end=None, **kw):
+    """
+    Run (key, cmd) pairs with at most `jobs` processes alive at once.
+    Returns (key, rc, stderr) of the first failure, or None if all succeeded.
+    Keys are page numbers. A nonzero exit for which past_end(rc, stderr_bytes)
+    is true means that page is past the end of the document: it is not a
+    failure, and no higher page is launched (their results are ignored).
+    Results are handled in completion order, so a slow page never holds up
+    the other slots, and on the first failure pending commands are cancelled
+    and running ones killed. stdout is discarded and stderr is kept as bytes,
+    decoded only for the failure being reported.
+    """
+    kw = {**POPEN_DEFAULTS, **kw}
+    procs = {}  # key -> running Popen
+    lock = threading.Lock()
+    stopped = threading.Event()
+    cutoff = [None]  # first page found past the end of the document
+
+    def beyond_end(key):
+        return cutoff[0] is not None and key > cutoff[0]
+
+    def run_one(key, cmd):
+        with lock:
+            # started after a failure, or past a known end: don't launch
+            if stopped.is_set() or beyond_end(key):
+                return key, None, b""
+            if verbose:
+                print(f"Running: {' '.join(cmd)}")
+            p = procs[key] = subprocess.Popen(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **kw)
+        _, se = p.communicate()
+        rc = p.returncode
+        with lock:
+            del procs[key]
+            if rc and past_end and past_end(rc, se):
+                # Record the end before this thread picks up its next page.
+                if cutoff[0] is None or key < cutoff[0]:
+                    cutoff[0] = key
+                rc = None
+        return key, rc, se
+
+    def stop():
+        with lock:
+            stopped.set()
+            for p in procs.values():
+                p.kill()
+
+    failure = None
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_one, key, cmd) for key, cmd in cmds]
+        try:
+            for fut in as_completed(futures):
+                key, rc, se = fut.result()
+                if not rc or beyond_end(key):  # rc is None: skipped or past the end
+                    continue
+                failure = (key, rc, se.decode(errors="replace"))
+                break
+        finally:
+            # Normally a no-op; after a failure (or Ctrl+C) drop what is queued
+            # and kill what is running so the pool shuts down promptly.
+            for f in futures:
+                f.cancel()
+            stop()
+    return failure
+
 def main():
     ap = argparse.ArgumentParser(
         description="Convert PDF pages to SVG using pdftocairo and list outputs.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=textwrap.dedent("""\
             Notes:
-              • This drives pdftocairo one page at a time to avoid output-prefix quirks.
+              • This drives pdftocairo one page per process to avoid output-prefix quirks:
+                -svg is a single-file format, so a -f/-l range is written to ONE file
+                (the output name is not used as a page prefix). Up to --jobs pages are
+                converted concurrently instead.
               • Requires Poppler (pdftocairo) on your PATH.
         """)
     )
     ap.add_argument("-i", "--input", required=True, help="Path to input PDF")
     ap.add_argument("-o", "--out", required=True, help="Output directory for SVG files")
     ap.add_argument("--first", type=int, help="First page (1-based)")
-    ap.add_argument("--last",  type=int, help="Last page (1-based)")
-    ap.add_argument("--no-info", action="store_true", help="Skip pdfinfo probe")
+    ap.add_argument("--last",  type=int, help="Last page (1-based); pages past the end of the PDF are skipped")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Max concurrent pdftocairo processes (default: CPU count)")
+    ap.add_argument("--no-info", action="store_true",
+                    help="Skip pdfinfo probe (implied when both --first and --last are given)")
     ap.add_argument("--verbose", action="store_true", help="Print extra debug logs")
     args = ap.parse_args()
 
@@ -62,21 +147,22 @@ def main():
     out_dir = os.path.abspath(args.out)
     os.makedirs(out_dir, exist_ok=True)
 
-    # 3) Optional pdfinfo
+    # 3) Optional pdfinfo. An explicit --first/--last range needs no page
+    #    count, so skip the extra process in that case.
     pages = None
-    if not args.no_info:
+    explicit_range = args.first is not None and args.last is not None
+    if explicit_range and args.verbose and not args.no_info:
+        print("Page range given; skipping pdfinfo probe.")
+    if not args.no_info and not explicit_range:
         pdfinfo = shutil.which("pdfinfo")
         if pdfinfo:
-            rc, so, se = run_cmd([pdfinfo, pdf])
+            rc, so, se = run_cmd([pdfinfo, pdf], text=False)
             if args.verbose:
-                print("pdfinfo output:\n" + (so or se or "").strip())
+                print("pdfinfo output:\n" + (so or se or b"").decode(errors="replace").strip())
             if rc == 0 and so:
-                for line in so.splitlines():
-                    if line.strip().startswith("Pages:"):
-                        try:
-                            pages = int(line.split(":")[1])
-                        except Exception:
-                            pass
+                m = PAGES_RE.search(so)
+                if m:
+                    pages = int(m.group(1))
         elif args.verbose:
             print("pdfinfo not found; skipping info probe.")
 
@@ -86,24 +172,37 @@ def main():
     if pages and last > pages:
         last = pages
     if args.verbose:
-        print(f"Converting pages {first}..{last} (one-by-one)")
+        print(f"Converting pages {first}..{last} (one process per page)")
         print(f"pdftocairo exe: {exe}")
         print(f"Output dir: {out_dir}")
 
-    # 5) Convert one page at a time
-    generated = []
-    for pnum in range(first, last + 1):
-        out_name = f"page-{pnum:03d}.svg"    # exact output file per page
-        cmd = [exe, "-svg", "-f", str(pnum), "-l", str(pnum), pdf, out_name]
-        if args.verbose:
-            print(f"Running: {' '.join(cmd)}  (cwd={out_dir})")
-        rc, so, se = run_cmd(cmd, cwd=out_dir)
-        if rc != 0:
-            print(f"pdftocairo failed on page {pnum}.", file=sys.stderr)
-            if se: print(se.strip(), file=sys.stderr)
-            return rc
-        if os.path.exists(os.path.join(out_dir, out_name)):
-            generated.append(out_name)
+    # 5) Convert pages in parallel, one process per page.
+    #    A single "-f first -l last" run cannot be used here: for -svg, pdftocairo
+    #    writes every page of the range into the one named output file rather
+    #    than emitting page-N.svg files, so per-page output needs per-page runs.
+    jobs = max(1, min(args.jobs, last - first + 1))
+    expected = [f"page-{pnum:03d}.svg" for pnum in range(first, last + 1)]  # exact output file per page
+    cmds = [(pnum, [exe, "-svg", "-f", str(pnum), "-l", str(pnum), pdf,
+                    os.path.join(out_dir, out_name)])
+            for pnum, out_name in zip(range(first, last + 1), expected)]
+    # Without a page count (pdfinfo skipped or unavailable), --last may run
+    # past the end of the document; treat those pages as absent, not failed,
+    # and stop launching pages once the end has been found.
+    past_end = None
+    if pages is None:
+        past_end = lambda rc, se: PAST_END_RE.search(se) is not None
+    failure = run_parallel(cmds, jobs, verbose=args.verbose, past_end=past_end)
+    if failure:
+        pnum, rc, se = failure
+        print(f"pdftocairo failed on page {pnum}.", file=sys.stderr)
+        if se: print(se.strip(), file=sys.stderr)
+        return rc
+
+    # One directory read instead of a stat per page; `expected` is already
+    # in page order, so no sorting is needed.
+    with os.scandir(out_dir) as it:
+        present = {e.name for e in it if e.name.endswith(".svg")}
+    generated = [name for name in expected if name in present]
 
     # 6) Validate & list results
     if not generated:
@@ -111,12 +210,6 @@ def main():
         print("Directory listing:", os.listdir(out_dir), file=sys.stderr)
         return 1
 
-    # Sort numerically in case of partial ranges
-    def pnum(name): 
-        try: return int(name.split("-")[1].split(".")[0])
-        except: return 0
-    generated.sort(key=pnum)
-
     print(f"OK: Generated {len(generated)} SVG file(s) in {out_dir}")
     for f in generated:
         print(" -", f)
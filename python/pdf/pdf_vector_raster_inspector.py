@@ -17,7 +17,9 @@ Output schema per page (as a list of such dicts):
 }
 
 Notes:
-  - Uses PyMuPDF (fitz) for PDF parsing.
+  - Uses PyMuPDF (fitz) for PDF parsing and NumPy to classify image boxes.
+    '--backend pdfium' walks page objects with pypdfium2 instead (optional);
+    it does not look at annotations.
   - Heuristics are used to label raster objects as 'logo', 'stamp',
     'scanned_page', or 'image' based on size and placement.
   - 'vector_objects' includes 'text' if the page has selectable text, 'lines'
@@ -25,16 +27,31 @@ Notes:
     bezier / complex shapes appear.
 
 Install:
-  pip install pymupdf
+  pip install pymupdf numpy
+  pip install pypdfium2        # optional, for --backend pdfium
+  pip install numba            # optional, faster on pages with many images
 
 Usage:
   python pdf_vector_raster_inspector.py input.pdf > report.json
+  python pdf_vector_raster_inspector.py input.pdf --force-refresh
+
+  Reports are cached in ~/.cache/pdf_vector_raster_inspector/, keyed by the
+  PDF's content hash; --force-refresh ignores the cached copy.
 """
 
 import argparse
+import hashlib
 import json
+import mmap
+import os
+import re
 import sys
-from typing import List, Dict, Any, Set
+import tempfile
+import textwrap
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Set, Iterable, Iterator
 
 try:
     import fitz  # PyMuPDF
@@ -42,6 +59,49 @@ except Exception as e:
     print("Error: PyMuPDF is required. Install with 'pip install pymupdf'.", file=sys.stderr)
     raise
 
+try:
+    import numpy as np
+except Exception:
+    print("Error: NumPy is required. Install with 'pip install numpy'.", file=sys.stderr)
+    raise
+
+
+def make_classifier(page_w, page_h):
+    """
+    Return classify(x0, y0, x1, y1) -> label for one page size.
+
+    The page-dependent thresholds are computed once here rather than on
+    every call; the heuristic is the one documented on classify_raster_block.
+    """
+    page_area = max(1.0, page_w * page_h)
+    top = 0.15 * page_h
+    bottom = 0.85 * page_h
+    left = 0.15 * page_w
+    right = 0.85 * page_w
+
+    def classify(x0, y0, x1, y1) -> str:
+        ratio = max(0.0, x1 - x0) * max(0.0, y1 - y0) / page_area
+
+        # Heuristics
+        if ratio >= 0.6:
+            return "scanned_page"
+        if ratio >= 0.1:
+            return "large_image"
+
+        # Small images: distinguish logo vs stamp by placement
+        if ratio <= 0.02:
+            # Common: logo at top-left/top-right, stamp at bottom-right/bottom
+            near_side = x1 >= right or x0 <= left
+            if near_side and y1 >= bottom:
+                return "stamp"
+            if near_side and y0 <= top:
+                return "logo"
+
+        # Fallback / medium-small generic
+        return "image"
+
+    return classify
+
 
 def classify_raster_block(bbox, page_w, page_h) -> str:
     """
@@ -49,50 +109,104 @@ def classify_raster_block(bbox, page_w, page_h) -> str:
 
     Returns one of: 'scanned_page', 'large_image', 'logo', 'stamp', 'image'
     """
-    x0, y0, x1, y1 = bbox
-    bw = max(0.0, x1 - x0)
-    bh = max(0.0, y1 - y0)
-    area = bw * bh
-    page_area = max(1.0, page_w * page_h)
-    ratio = area / page_area
+    return make_classifier(page_w, page_h)(*bbox)
 
-    # Corners / edges helpers
-    near_top = y0 <= 0.15 * page_h
-    near_bottom = y1 >= 0.85 * page_h
-    near_right = x1 >= 0.85 * page_w
-    near_left = x0 <= 0.15 * page_w
-
-    # Heuristics
-    if ratio >= 0.6:
-        return "scanned_page"
-    if ratio >= 0.1:
-        return "large_image"
-
-    # Small images: distinguish logo vs stamp by placement
-    if ratio <= 0.02:
-        # Common: logo at top-left/top-right, stamp at bottom-right/bottom
-        if near_bottom and (near_right or near_left):
-            return "stamp"
-        if near_top and (near_right or near_left):
-            return "logo"
-        # Fallback
-        return "image"
 
-    # Medium-small generic
-    return "image"
+# All classifier paths compute in float64 with the same expressions
+# (area / page_area, 0.15 * page size, ...), so a bbox gets the same label
+# whichever path its page takes.
+RASTER_LABELS = np.array(["scanned_page", "large_image", "stamp", "logo"])
+NUMPY_MIN_BBOXES = 16
+# Pages with thousands of small images (stamps, tiles) go through a numba
+# kernel when numba is installed; it is only imported, and JIT-compiled,
+# the first time such a page is seen.
+NUMBA_MIN_BBOXES = 256
+LABELS_BY_CODE = np.append(RASTER_LABELS, "image")
 
 
-def get_image_blocks(page) -> List[Dict[str, Any]]:
+def classify_raster_blocks(bboxes, page_w, page_h) -> Set[str]:
     """
-    Return image blocks with bounding boxes via page.get_text('dict').
-    Each block: {"type": 1, "bbox": [x0, y0, x1, y1], ...}
+    Vectorized classify_raster_block over all image bboxes of a page.
+
+    Applies the same heuristics to an (N, 4) array at once and returns the
+    set of labels seen. Below NUMPY_MIN_BBOXES boxes, array setup costs more
+    than it saves, so a per-page make_classifier() closure is used instead.
     """
-    blocks = []
-    text_dict = page.get_text("dict")
-    for b in text_dict.get("blocks", []):
-        if b.get("type") == 1 and "bbox" in b:
-            blocks.append(b)
-    return blocks
+    if len(bboxes) < NUMPY_MIN_BBOXES:
+        classify = make_classifier(page_w, page_h)
+        return {classify(*b) for b in bboxes}
+
+    bbox = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    if len(bbox) > NUMBA_MIN_BBOXES:
+        kernel = _numba_kernel()
+        if kernel is not None:
+            codes = kernel(bbox, float(page_w), float(page_h))
+            return set(LABELS_BY_CODE[np.unique(codes)].tolist())
+
+    x0, y0, x1, y1 = bbox[:, 0], bbox[:, 1], bbox[:, 2], bbox[:, 3]
+    bw = np.maximum(0.0, x1 - x0)
+    bh = np.maximum(0.0, y1 - y0)
+    ratio = bw * bh / max(1.0, page_w * page_h)
+
+    near_top = y0 <= 0.15 * page_h
+    near_bottom = y1 >= 0.85 * page_h
+    near_side = (x1 >= 0.85 * page_w) | (x0 <= 0.15 * page_w)
+    small = ratio <= 0.02
+
+    labels = np.select(
+        [ratio >= 0.6, ratio >= 0.1, small & near_bottom & near_side, small & near_top & near_side],
+        RASTER_LABELS,
+        default="image",
+    )
+    return set(labels.tolist())
+
+
+_numba_classify = None
+
+
+def _numba_kernel():
+    """Return the compiled bbox kernel, or None if numba is not installed."""
+    global _numba_classify
+    if _numba_classify is None:
+        try:
+            from numba import njit, prange
+        except ImportError:
+            _numba_classify = False
+            return None
+
+        @njit(cache=True, parallel=True)
+        def classify_bboxes(bboxes, page_w, page_h):
+            # Codes index LABELS_BY_CODE; same heuristic as classify_raster_block.
+            n = bboxes.shape[0]
+            out = np.empty(n, dtype=np.int8)
+            page_area = max(1.0, page_w * page_h)
+            for i in prange(n):
+                x0, y0, x1, y1 = bboxes[i, 0], bboxes[i, 1], bboxes[i, 2], bboxes[i, 3]
+                ratio = max(0.0, x1 - x0) * max(0.0, y1 - y0) / page_area
+                near_side = x1 >= 0.85 * page_w or x0 <= 0.15 * page_w
+                if ratio >= 0.6:
+                    out[i] = 0
+                elif ratio >= 0.1:
+                    out[i] = 1
+                elif ratio <= 0.02 and near_side and y1 >= 0.85 * page_h:
+                    out[i] = 2
+                elif ratio <= 0.02 and near_side and y0 <= 0.15 * page_h:
+                    out[i] = 3
+                else:
+                    out[i] = 4
+            return out
+
+        _numba_classify = classify_bboxes
+    return _numba_classify or None
+
+
+# 'blocks' only reports image blocks when asked to (unlike 'dict')
+BLOCK_FLAGS = fitz.TEXTFLAGS_BLOCKS | fitz.TEXT_PRESERVE_IMAGES
+
+
+# Drawing item operators, as reported by page.get_drawings()
+SIMPLE_OPS = frozenset({"l", "re", "m", "h"})   # straight lines / rects -> 'lines'
+CURVE_OPS = frozenset({"c", "qu"})              # curves / quads -> 'paths'
 
 
 def collect_vector_kinds_from_drawings(drawings: List[Dict[str, Any]]) -> Set[str]:
@@ -100,88 +214,414 @@ def collect_vector_kinds_from_drawings(drawings: List[Dict[str, Any]]) -> Set[st
     Inspect drawing items returned by page.get_drawings() and infer whether
     we saw simple 'lines' and/or more complex 'paths'.
     """
-
-    OPERATOR_MAP = {
-        "l": "line",
-        "c": "curve",
-        "re": "rect",
-        "m": "moveto",
-        "h": "closepath",
-        "q": "save_state",
-        "Q": "restore_state",
-        "qu": "quad"
-    }
-    
-    kinds = set()
+    has_line = has_path = False
     for d in drawings:
         for item in d.get("items", []):
-            # Ensure item is a dictionary before accessing its properties
-            print("item:", item)
-            if isinstance(item, dict):
-                t = item.get("type", "").lower()
-                kinds.add(t)
-            elif isinstance(item, tuple):
-                # Handle tuple case (log or process as needed)
+            if isinstance(item, tuple):
                 op = str(item[0]).lower()
-                obj_type = OPERATOR_MAP.get(op, op)  # default to op if not mapped
-                kinds.add(obj_type)
+            elif isinstance(item, dict):
+                op = item.get("type", "").lower()
+            else:
+                continue
+            if op in CURVE_OPS:
+                has_path = True
+            elif op in SIMPLE_OPS:
+                has_line = True
+        if has_line and has_path:
+            break
+
+    kinds = set()
+    if has_line:
+        kinds.add("lines")
+    if has_path:
+        kinds.add("paths")
     return kinds
 
 
-def analyze_pdf(pdf_path: str) -> List[Dict[str, Any]]:
-    doc = fitz.open(pdf_path)
-    results: List[Dict[str, Any]] = []
+# Fixed output order for the label lists (alphabetical, as sorted() gave).
+VECTOR_KINDS_ORDER = ("lines", "paths")
+RASTER_LABELS_ORDER = ("image", "large_image", "logo", "scanned_page", "stamp")
+
+
+# Cheap content-stream probes, so pages without vectors / images can skip the
+# expensive calls. 'Do' may paint a Form XObject holding drawings or images,
+# so it counts as a hit for both. Annotation appearance streams are not part
+# of the page contents, so pages with annotations skip the probes entirely.
+PATH_OPS_RE = re.compile(rb"(?:^|\s)(?:re|[mlcvyh]|Do)(?=[\s\[\]()<>/{}%]|$)")
+IMAGE_OPS_RE = re.compile(rb"(?:^|\s)(?:BI|Do)(?=\s|$)")
+
+
+def analyze_page(page, page_no: int) -> Dict[str, Any]:
+    """Build the report entry for a single fitz page (page_no is 1-based)."""
+    page_rect = page.rect
+    page_w, page_h = page_rect.width, page_rect.height
+
+    contents = page.read_contents()
+    has_annots = page.first_annot is not None
+    may_have_images = (has_annots or bool(page.get_images())
+                       or IMAGE_OPS_RE.search(contents) is not None)
+    may_have_paths = has_annots or PATH_OPS_RE.search(contents) is not None
+
+    # One 'blocks' sweep serves both checks. Block tuples are
+    # (x0, y0, x1, y1, text, block_no, block_type); type 0 is text, 1 is image.
+    # Image blocks are only requested when the page can contain images.
+    blocks = page.get_text(
+        "blocks", flags=BLOCK_FLAGS if may_have_images else fitz.TEXTFLAGS_BLOCKS
+    )
+
+    # Raster detection via image blocks (with positions)
+    image_bboxes = [b[:4] for b in blocks if b[6] == 1]
+    raster_labels: Set[str] = (
+        classify_raster_blocks(image_bboxes, page_w, page_h) if image_bboxes else set()
+    )
+
+    # Vector detection:
+    #   - selectable text
+    #   - vectors via get_drawings(), skipped when no path operator is present
+    has_text = any(b[6] == 0 and b[4].strip() for b in blocks)
+    if may_have_paths:
+        vector_kinds = collect_vector_kinds_from_drawings(page.get_drawings())
+    else:
+        vector_kinds = set()
+
+    vector_objects = []
+    if has_text:
+        vector_objects.append("text")
+    vector_objects.extend(k for k in VECTOR_KINDS_ORDER if k in vector_kinds)
+
+    return {
+        "page": page_no,
+        "vector_content": bool(vector_objects),
+        "raster_content": bool(image_bboxes),
+        "raster_objects": [k for k in RASTER_LABELS_ORDER if k in raster_labels],
+        "vector_objects": vector_objects if vector_objects else []
+    }
+
+
+def _pdfium_page_bounds(obj):
+    """
+    Bounds (left, bottom, right, top) of a pypdfium2 page object in page space.
+
+    Objects inside Form XObjects report bounds in the form's own space, so
+    the box corners are mapped through each enclosing form's matrix.
+    """
+    # pypdfium2 < 5 calls this get_pos()
+    l, b, r, t = (obj.get_bounds if hasattr(obj, "get_bounds") else obj.get_pos)()
+    corners = [(l, b), (l, t), (r, b), (r, t)]
+    form = obj.container
+    while form is not None:
+        m = form.get_matrix()
+        corners = [(m.a * x + m.c * y + m.e, m.b * x + m.d * y + m.f) for x, y in corners]
+        form = form.container
+    xs = [x for x, _ in corners]
+    ys = [y for _, y in corners]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def analyze_page_pdfium(page, page_no: int) -> Dict[str, Any]:
+    """
+    Build the report entry for a single pypdfium2 page (page_no is 1-based).
+
+    Walks the page objects (descending into Form XObjects) instead of
+    extracting text blocks and drawings; image boundaries are converted to
+    the top-left origin used by classify_raster_block. Rotation is ignored.
+    Annotations (stamps, ink, FreeText, ...) are not inspected, unlike the
+    PyMuPDF backend, which renders their appearance streams.
+    """
+    import pypdfium2.raw as pdfium_c
+
+    left, _, _, top = page.get_cropbox()
+    page_w, page_h = page.get_size()
+
+    image_bboxes = []
+    has_text_obj = has_line = has_path = False
+    for obj in page.get_objects():
+        if obj.type == pdfium_c.FPDF_PAGEOBJ_TEXT:
+            has_text_obj = True
+        elif obj.type == pdfium_c.FPDF_PAGEOBJ_IMAGE:
+            x0, y0, x1, y1 = _pdfium_page_bounds(obj)
+            image_bboxes.append((x0 - left, top - y1, x1 - left, top - y0))
+        elif obj.type == pdfium_c.FPDF_PAGEOBJ_PATH and not (has_line and has_path):
+            for i in range(pdfium_c.FPDFPath_CountSegments(obj.raw)):
+                seg = pdfium_c.FPDFPath_GetPathSegment(obj.raw, i)
+                # Moveto only starts a subpath and closing is a flag on the
+                # segment, so only lineto / bezierto count (as get_drawings does).
+                seg_type = pdfium_c.FPDFPathSegment_GetType(seg)
+                if seg_type == pdfium_c.FPDF_SEGMENT_BEZIERTO:
+                    has_path = True
+                elif seg_type == pdfium_c.FPDF_SEGMENT_LINETO:
+                    has_line = True
+
+    # Same rule as the PyMuPDF backend: non-blank text inside the mediabox.
+    has_text = False
+    if has_text_obj:
+        textpage = page.get_textpage()
+        has_text = bool(textpage.get_text_bounded(*page.get_mediabox()).strip())
+        textpage.close()
+
+    raster_labels: Set[str] = (
+        classify_raster_blocks(image_bboxes, page_w, page_h) if image_bboxes else set()
+    )
+    vector_objects = ["text"] if has_text else []
+    if has_line:
+        vector_objects.append("lines")
+    if has_path:
+        vector_objects.append("paths")
+
+    return {
+        "page": page_no,
+        "vector_content": bool(vector_objects),
+        "raster_content": bool(image_bboxes),
+        "raster_objects": [k for k in RASTER_LABELS_ORDER if k in raster_labels],
+        "vector_objects": vector_objects
+    }
+
 
-    for i, page in enumerate(doc, start=1):
-        page_rect = page.rect
-        page_w, page_h = page_rect.width, page_rect.height
+BACKENDS = ("pymupdf", "pdfium")
 
-        # Raster detection via image blocks (with positions)
-        image_blocks = get_image_blocks(page)
-        raster_labels: Set[str] = set()
-        for ib in image_blocks:
-            label = classify_raster_block(ib["bbox"], page_w, page_h)
-            raster_labels.add(label)
+# Below this many pages, process pool startup costs more than it saves.
+PARALLEL_MIN_PAGES = 8
+MAX_WORKERS = 4
 
-        # Vector detection:
-        #   - selectable text
-        #   - vectors via get_drawings()
-        has_text = len(page.get_text("words")) > 0
-        drawings = page.get_drawings()
-        vector_kinds = collect_vector_kinds_from_drawings(drawings)
 
-        vector_objects = []
-        if has_text:
-            vector_objects.append("text")
-        vector_objects.extend(sorted(vector_kinds))
+def open_pdf(pdf_path: str):
+    """
+    Open a PDF with PyMuPDF over a read-only memory map of the file.
 
-        page_result = {
-            "page": i,
-            "vector_content": bool(vector_objects),
-            "raster_content": bool(image_blocks),
-            "raster_objects": sorted(raster_labels) if raster_labels else [],
-            "vector_objects": vector_objects if vector_objects else []
-        }
-        results.append(page_result)
+    MuPDF then reads objects straight from the mapped pages instead of
+    copying them through stdio buffers. The document keeps the mapping alive
+    (via its stream reference) and it is released with the document. Falls
+    back to a plain path open for empty files or PyMuPDF versions that do
+    not accept a memoryview stream.
+    """
+    try:
+        with open(pdf_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return fitz.open(pdf_path)
+    try:
+        return fitz.open(stream=memoryview(mm), filetype="pdf")
+    except TypeError:
+        mm.close()
+        return fitz.open(pdf_path)
+
+
+def _page_count(pdf_path: str, backend: str) -> int:
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def _iter_range(pdf_path: str, start: int, stop: int,
+                backend: str = "pymupdf") -> Iterator[Dict[str, Any]]:
+    """Open the PDF once and yield reports for pages [start, stop) (0-based)."""
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            for i in range(start, stop):
+                page = pdf[i]
+                result = analyze_page_pdfium(page, i + 1)
+                page.close()
+                yield result
+        finally:
+            pdf.close()
+        return
+
+    doc = open_pdf(pdf_path)
+    try:
+        for i in range(start, stop):
+            page = doc[i]
+            result = analyze_page(page, i + 1)
+            # Drop the page before the consumer runs so MuPDF can free it.
+            del page
+            yield result
+    finally:
+        doc.close()
+
+
+def _analyze_range(pdf_path: str, start: int, stop: int,
+                   backend: str = "pymupdf") -> List[Dict[str, Any]]:
+    """Worker: open the PDF once and analyze pages [start, stop) (0-based)."""
+    return list(_iter_range(pdf_path, start, stop, backend))
+
+
+# Upper bound on pages per pool task, and on tasks in flight per worker, so
+# memory held by finished-but-unconsumed slabs stays bounded on huge PDFs.
+SLAB_PAGES = 64
+SLABS_IN_FLIGHT = 2
+
+
+def _iter_analyze_pdf(pdf_path: str, backend: str = "pymupdf") -> Iterator[Dict[str, Any]]:
+    page_count = _page_count(pdf_path, backend)
+    workers = min(os.cpu_count() or 1, MAX_WORKERS)
+
+    # A single worker would only add pickling and an extra process.
+    if page_count < PARALLEL_MIN_PAGES or workers < 2:
+        yield from _iter_range(pdf_path, 0, page_count, backend)
+        return
+
+    # Contiguous slabs of pages, so each task parses the PDF once and the
+    # slabs concatenate back in page order. Normally one slab per worker;
+    # only very large PDFs are cut into more, smaller slabs.
+    slab = min(-(-page_count // workers), SLAB_PAGES)
+    slabs = [(lo, min(lo + slab, page_count)) for lo in range(0, page_count, slab)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for lo, hi in slabs:
+            if len(pending) >= workers * SLABS_IN_FLIGHT:
+                yield from pending.popleft().result()
+            pending.append(pool.submit(_analyze_range, pdf_path, lo, hi, backend))
+        while pending:
+            yield from pending.popleft().result()
+
+
+# Reports are cached per PDF content hash. Bump CACHE_VERSION whenever the
+# report for an unchanged PDF would change, so stale entries are ignored.
+CACHE_DIR = Path.home() / ".cache" / "pdf_vector_raster_inspector"
+CACHE_VERSION = 6
+
+
+def file_digest(pdf_path: str) -> str:
+    """MD5 of the file contents, streamed so large PDFs are not read into memory."""
+    with open(pdf_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "md5").hexdigest()
+        h = hashlib.md5()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def iter_analyze_pdf(pdf_path: str, force_refresh: bool = False,
+                     backend: str = "pymupdf") -> Iterator[Dict[str, Any]]:
+    """
+    Yield the per-page report one page at a time, reusing a cached copy when
+    the PDF's contents are unchanged (unless force_refresh is set).
 
-    doc.close()
-    return results
+    backend="pdfium" uses pypdfium2 when it is installed and falls back to
+    PyMuPDF otherwise.
+    """
+    if backend == "pdfium":
+        try:
+            import pypdfium2  # noqa: F401
+        except ImportError:
+            print("Warning: pypdfium2 not installed; falling back to PyMuPDF.", file=sys.stderr)
+            backend = "pymupdf"
+
+    # Cache entries hold one JSON page report per line, so they can be read
+    # and written as a stream; a final "null" line marks a complete entry.
+    digest = file_digest(pdf_path)
+    cache_path = CACHE_DIR / f"{digest}-{backend}-v{CACHE_VERSION}.jsonl"
+    emitted = 0  # pages already yielded from the cache
+    if not force_refresh:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    page = json.loads(line)
+                    if page is None:
+                        return
+                    if page["page"] != emitted + 1:
+                        raise ValueError("cache entry out of order")
+                    emitted += 1
+                    yield page
+            raise ValueError("cache entry incomplete")
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable or damaged entry: treat it as a miss, and only yield
+            # the pages the cache did not already provide.
+            pass
+
+    # Write to a temp file and rename once complete, so readers never see a
+    # partial entry. A cache that cannot be written is not an error: on any
+    # OSError the entry is dropped and the report carries on without it.
+    tmp = cache = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        cache = os.fdopen(fd, "w", encoding="utf-8")
+    except OSError:
+        pass
+
+    try:
+        for page in _iter_analyze_pdf(pdf_path, backend):
+            if cache is not None:
+                try:
+                    cache.write(json.dumps(page) + "\n")
+                except OSError:
+                    _discard_cache_tmp(cache, tmp)
+                    tmp = cache = None
+            if page["page"] > emitted:
+                yield page
+        if cache is not None:
+            try:
+                cache.write("null\n")
+                cache.close()
+                os.replace(tmp, cache_path)
+                tmp = None
+            except OSError:
+                pass
+    finally:
+        if tmp is not None:
+            _discard_cache_tmp(cache, tmp)
+
+
+def _discard_cache_tmp(cache, tmp: str) -> None:
+    """Close and remove a partially written cache entry, ignoring errors."""
+    try:
+        if cache is not None:
+            cache.close()
+    except OSError:
+        pass
+    try:
+        os.unlink(tmp)
+    except OSError:
+        pass
+
+
+def analyze_pdf(pdf_path: str, force_refresh: bool = False,
+                backend: str = "pymupdf") -> List[Dict[str, Any]]:
+    """Return the full per-page report as a list (see iter_analyze_pdf)."""
+    return list(iter_analyze_pdf(pdf_path, force_refresh=force_refresh, backend=backend))
+
+
+def write_report(pages: Iterable[Dict[str, Any]], out) -> None:
+    """
+    Write page reports to `out` as a JSON array as they arrive, formatted
+    like json.dump(list, indent=2), without holding the whole list.
+    """
+    first = True
+    for page in pages:
+        out.write("[\n" if first else ",\n")
+        out.write(textwrap.indent(json.dumps(page, indent=2), "  "))
+        first = False
+    out.write("[]" if first else "\n]")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Detect raster vs vector content in a PDF (per page).")
     parser.add_argument("pdf", help="Path to the PDF file to analyze.")
     parser.add_argument("-o", "--output", help="Path to write JSON output (defaults to stdout).")
+    parser.add_argument("--force-refresh", action="store_true",
+                        help="Ignore any cached report and re-analyze the PDF.")
+    parser.add_argument("--backend", choices=BACKENDS, default="pymupdf",
+                        help="PDF library used for the page walk (default: pymupdf). "
+                             "'pdfium' needs pypdfium2 and falls back to pymupdf without it; "
+                             "it ignores annotations (stamps, ink, FreeText, ...).")
     args = parser.parse_args()
 
-    report = analyze_pdf(args.pdf)
+    pages = iter_analyze_pdf(args.pdf, force_refresh=args.force_refresh, backend=args.backend)
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2)
+            write_report(pages, f)
     else:
-        json.dump(report, sys.stdout, indent=2)
-
+        write_report(pages, sys.stdout)
 
 if __name__ == "__main__":
     main()